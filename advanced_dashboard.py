@@ -5,9 +5,19 @@ import plotly.graph_objects as go
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from database import get_db_manager
-from multilanguage import get_ui_text
+from multilanguage import get_ui_text, get_ui_texts, get_openai_client
+import io
 import json
 
+@st.cache_data(ttl=30)
+def _analytics_summary(days: int) -> Dict:
+    """Analytics aggregate with a short TTL.
+
+    The overview tab re-renders on every rerun; a 30s TTL keeps the
+    leads-table scan off the per-interaction path.
+    """
+    return get_db_manager().get_analytics_summary(days=days)
+
 class AdvancedDashboard:
     """Advanced lead dashboard with analytics and management features."""
     
@@ -44,38 +54,53 @@ class AdvancedDashboard:
     
     def render_overview_tab(self, language: str):
         """Render overview dashboard with key metrics."""
-        st.subheader(get_ui_text("overview_title", language, "📈 Overview"))
+        t = get_ui_texts(
+            ["overview_title", "time_period", "refresh", "total_leads",
+             "avg_score", "high_priority", "conversion_rate", "recent_activity"],
+            language,
+            {
+                "overview_title": "📈 Overview",
+                "time_period": "Time Period",
+                "refresh": "🔄 Refresh",
+                "total_leads": "Total Leads",
+                "avg_score": "Avg Score",
+                "high_priority": "High Priority",
+                "conversion_rate": "Conversion Rate",
+                "recent_activity": "🕒 Recent Activity"
+            }
+        )
+        st.subheader(t["overview_title"])
         
         # Time period selector
         col1, col2 = st.columns([2, 1])
         with col1:
             period = st.selectbox(
-                get_ui_text("time_period", language, "Time Period"),
+                t["time_period"],
                 options=[7, 14, 30, 60, 90],
                 format_func=lambda x: f"Last {x} days",
                 index=2  # Default to 30 days
             )
         
         with col2:
-            if st.button(get_ui_text("refresh", language, "🔄 Refresh")):
+            if st.button(t["refresh"]):
                 st.rerun()
         
         # Get analytics data
-        analytics = self.db.get_analytics_summary(days=period)
+        analytics = _analytics_summary(days=period)
         
         # Key metrics cards
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
             st.metric(
-                label=get_ui_text("total_leads", language, "Total Leads"),
+                label=t["total_leads"],
                 value=analytics['total_leads'],
                 delta=self._calculate_delta(analytics['total_leads'], period)
             )
         
         with col2:
             st.metric(
-                label=get_ui_text("avg_score", language, "Avg Score"),
+                label=t["avg_score"],
                 value=f"{analytics['average_score']}/100",
                 delta=None
             )
@@ -83,7 +108,7 @@ class AdvancedDashboard:
         with col3:
             high_priority = analytics['leads_by_priority'].get('high', 0)
             st.metric(
-                label=get_ui_text("high_priority", language, "High Priority"),
+                label=t["high_priority"],
                 value=high_priority,
                 delta=None
             )
@@ -91,7 +116,7 @@ class AdvancedDashboard:
         with col4:
             conversion_rate = self._calculate_conversion_rate(period)
             st.metric(
-                label=get_ui_text("conversion_rate", language, "Conversion Rate"),
+                label=t["conversion_rate"],
                 value=f"{conversion_rate}%",
                 delta=None
             )
@@ -106,7 +131,7 @@ class AdvancedDashboard:
             self.render_leads_by_language_chart(analytics, language)
         
         # Recent activity
-        st.subheader(get_ui_text("recent_activity", language, "🕒 Recent Activity"))
+        st.subheader(t["recent_activity"])
         self.render_recent_leads_table(language, limit=10)
     
     def render_leads_management_tab(self, language: str):
@@ -199,6 +224,20 @@ class AdvancedDashboard:
                         file_name=f"filtered_leads_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
                         mime="text/csv"
                     )
+            
+            # Bulk AI summaries go through the Batch API: one upload for
+            # all leads instead of one request per lead, at half the
+            # per-token cost and outside the interactive rate limits
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button(get_ui_text("regenerate_summaries", language, "🤖 Regenerate AI Summaries")):
+                    batch_id = self._submit_summary_batch(leads)
+                    st.success(get_ui_text("batch_submitted", language, f"Batch submitted: {batch_id}"))
+            
+            with col2:
+                if st.session_state.get("summary_batch_id"):
+                    if st.button(get_ui_text("check_batch", language, "⏳ Check Summary Batch")):
+                        self._apply_summary_batch(language)
     
     def render_analytics_tab(self, language: str):
         """Render detailed analytics."""
@@ -420,7 +459,7 @@ class AdvancedDashboard:
     
     def render_language_performance_chart(self, language: str):
         """Render language performance analysis."""
-        analytics = self.db.get_analytics_summary(days=30)
+        analytics = _analytics_summary(days=30)
         
         if analytics['leads_by_language']:
             # Calculate performance metrics by language
@@ -451,6 +490,77 @@ class AdvancedDashboard:
         """Bulk update lead status."""
         for lead in leads:
             self.db.update_lead_status(lead['id'], status)
+        # Aggregates changed - don't wait out the TTL
+        _analytics_summary.clear()
+    
+    def _submit_summary_batch(self, leads: List[Dict]) -> str:
+        """Submit a Batch API job that summarizes each lead for follow-up."""
+        rows = []
+        statuses = {}
+        for lead in leads:
+            statuses[lead['id']] = lead.get('status', 'new')
+            profile = ", ".join(
+                f"{field}: {lead[field]}"
+                for field in ('name', 'email', 'phone', 'company', 'interest', 'budget', 'score')
+                if lead.get(field)
+            )
+            rows.append(json.dumps({
+                "custom_id": lead['id'],
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": "gpt-4o-mini",
+                    "messages": [
+                        {"role": "system", "content": "Write a 2-sentence sales follow-up summary for this lead."},
+                        {"role": "user", "content": profile}
+                    ],
+                    "max_tokens": 120,
+                    "temperature": 0
+                }
+            }))
+        
+        client = get_openai_client()
+        batch_file = client.files.create(
+            file=io.BytesIO("\n".join(rows).encode("utf-8")),
+            purpose="batch"
+        )
+        batch = client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        
+        st.session_state.summary_batch_id = batch.id
+        st.session_state.summary_batch_statuses = statuses
+        return batch.id
+    
+    def _apply_summary_batch(self, language: str):
+        """Poll the pending summary batch and write results into lead notes."""
+        client = get_openai_client()
+        batch = client.batches.retrieve(st.session_state.summary_batch_id)
+        
+        if batch.status != "completed":
+            st.info(get_ui_text("batch_pending", language, f"Batch status: {batch.status}"))
+            return
+        
+        statuses = st.session_state.get("summary_batch_statuses", {})
+        output = client.files.content(batch.output_file_id).text
+        applied = 0
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            result = json.loads(line)
+            lead_id = result.get("custom_id")
+            try:
+                summary = result["response"]["body"]["choices"][0]["message"]["content"]
+            except (KeyError, IndexError, TypeError):
+                continue
+            self.db.update_lead_status(lead_id, statuses.get(lead_id, "new"), notes=summary)
+            applied += 1
+        
+        st.session_state.summary_batch_id = None
+        st.session_state.summary_batch_statuses = {}
+        st.success(get_ui_text("batch_applied", language, f"Applied {applied} summaries."))
     
     def _export_leads_to_csv(self, leads: List[Dict]) -> str:
         """Export leads to CSV format."""
@@ -459,16 +569,50 @@ class AdvancedDashboard:
     
     def _handle_export(self, data_type: str, format_type: str, period, language: str):
         """Handle data export."""
-        st.info(get_ui_text("export_processing", language, f"Exporting {data_type} in {format_type} format..."))
-        # Implementation would depend on the specific export requirements
-
-# Singleton instance
-_dashboard = None
+        if data_type != "leads":
+            st.info(get_ui_text("export_coming_soon", language, f"{data_type.title()} export coming soon!"))
+            return
+        
+        filters = {}
+        if period != "all":
+            filters['date_from'] = (datetime.now() - timedelta(days=period)).isoformat()
+        leads = self.db.get_all_leads(limit=100000, filters=filters)
+        
+        if not leads:
+            st.info(get_ui_text("no_leads_found", language, "No leads found for this period."))
+            return
+        
+        df = pd.DataFrame(leads)
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        
+        if format_type == "csv":
+            data, mime, ext = df.to_csv(index=False).encode('utf-8'), "text/csv", "csv"
+        elif format_type == "json":
+            data, mime, ext = df.to_json(orient="records").encode('utf-8'), "application/json", "json"
+        else:
+            # constant_memory streams rows out as they are written instead
+            # of materializing the whole workbook; URL autoconversion is a
+            # per-cell Python pass we don't need
+            output = io.BytesIO()
+            with pd.ExcelWriter(
+                output,
+                engine='xlsxwriter',
+                engine_kwargs={'options': {'constant_memory': True, 'strings_to_urls': False}}
+            ) as writer:
+                df.to_excel(writer, index=False, sheet_name='Leads')
+            data = output.getvalue()
+            mime = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            ext = "xlsx"
+        
+        st.download_button(
+            label=get_ui_text("download_export", language, "⬇️ Download Export"),
+            data=data,
+            file_name=f"{data_type}_{stamp}.{ext}",
+            mime=mime
+        )
 
+@st.cache_resource
 def get_dashboard() -> AdvancedDashboard:
     """Get the dashboard singleton instance."""
-    global _dashboard
-    if _dashboard is None:
-        _dashboard = AdvancedDashboard()
-    return _dashboard
+    return AdvancedDashboard()
 
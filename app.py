@@ -1,13 +1,18 @@
 import streamlit as st
-from openai import OpenAI
+import bcrypt
 import os
 import re
-import json
+import orjson
 import csv
 import pandas as pd
 from datetime import datetime
-import uuid
+from concurrent.futures import ThreadPoolExecutor
+from session_manager import get_session_manager
+from multilanguage import get_openai_client
+import secrets
 import hashlib
+import hmac
+import functools
 import time
 from typing import Dict, List, Optional
 
@@ -19,24 +24,10 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Initialize OpenAI client
-@st.cache_resource
-def get_openai_client():
-    """Initialize OpenAI client with API key from secrets."""
-    try:
-        api_key = st.secrets.get("OPENAI_API_KEY", os.getenv("OPENAI_API_KEY"))
-        if not api_key:
-            st.error("OpenAI API key not found. Please set it in Streamlit secrets or as an environment variable.")
-            st.stop()
-        return OpenAI(api_key=api_key)
-    except Exception as e:
-        st.error(f"Error initializing OpenAI client: {e}")
-        st.stop()
-
 # Load configuration
 @st.cache_data
-def load_config():
-    """Load configuration from file or create default if not exists."""
+def _load_config_from_disk(mtime: float):
+    """Parse the config file; cached per on-disk mtime."""
     default_config = {
         "branding": {
             "name": "Lia",
@@ -95,10 +86,10 @@ def load_config():
     
     if os.path.exists("config.json"):
         try:
-            with open("config.json", "r") as f:
-                config = json.load(f)
-                # Merge with default config to ensure all keys exist
-                return merge_config(default_config, config)
+            with open("config.json", "rb") as f:
+                config = orjson.loads(f.read())
+            # Merge with default config to ensure all keys exist
+            return merge_config(default_config, config)
         except Exception as e:
             st.error(f"Error loading configuration: {e}")
             return default_config
@@ -106,6 +97,18 @@ def load_config():
         save_config(default_config)
         return default_config
 
+def load_config():
+    """Load configuration from file or create default if not exists.
+
+    Keyed on the file's mtime so reruns and new sessions share the parsed
+    config, while edits (save_config or out-of-band) invalidate it.
+    """
+    try:
+        mtime = os.path.getmtime("config.json")
+    except OSError:
+        mtime = 0.0
+    return _load_config_from_disk(mtime)
+
 def merge_config(default: Dict, user: Dict) -> Dict:
     """Merge user config with default config to ensure all keys exist."""
     result = default.copy()
@@ -119,17 +122,19 @@ def merge_config(default: Dict, user: Dict) -> Dict:
 def save_config(config: Dict):
     """Save configuration to file."""
     try:
-        with open("config.json", "w") as f:
-            json.dump(config, f, indent=2)
+        with open("config.json", "wb") as f:
+            f.write(orjson.dumps(config, option=orjson.OPT_INDENT_2))
+        # Config changed - drop any cached prompts built from the old config
+        _build_system_prompt_cached.clear()
         return True
     except Exception as e:
         st.error(f"Error saving configuration: {e}")
         return False
 
 # Language support functions
-def get_ui_text(key: str, language: str = "en", fallback: str = None) -> str:
-    """Get UI text in the specified language."""
-    translations = {
+# UI translations, hoisted to module scope so lookups don't rebuild the
+# dict on every call
+_TRANSLATIONS = {
         "en": {
             "welcome": "Hi! I'm Lia, your AI assistant from LeadPulse. How can I help you today?",
             "input_placeholder": "Type your message here...",
@@ -208,14 +213,17 @@ def get_ui_text(key: str, language: str = "en", fallback: str = None) -> str:
             "conversion_rate": "Tasa de Conversión",
             "avg_score": "Puntuación Promedio"
         }
-    }
-    
-    if language in translations and key in translations[language]:
-        return translations[language][key]
+}
+
+@functools.lru_cache(maxsize=4096)
+def get_ui_text(key: str, language: str = "en", fallback: str = None) -> str:
+    """Get UI text in the specified language."""
+    if language in _TRANSLATIONS and key in _TRANSLATIONS[language]:
+        return _TRANSLATIONS[language][key]
     elif fallback:
         return fallback
     else:
-        return translations["en"].get(key, key)
+        return _TRANSLATIONS["en"].get(key, key)
 
 def detect_language(text: str) -> str:
     """Detect language from user input using simple heuristics."""
@@ -223,8 +231,8 @@ def detect_language(text: str) -> str:
         return "en"
     
     # Simple heuristic detection
-    chinese_chars = len(re.findall(r'[\u4e00-\u9fa5]', text))
-    spanish_chars = len(re.findall(r'[ñáéíóúü]', text.lower()))
+    chinese_chars = sum(1 for cp in map(ord, text) if 0x4e00 <= cp <= 0x9fa5)
+    spanish_chars = sum(1 for c in text.lower() if c in "ñáéíóúü")
     
     # If significant Chinese characters, likely Chinese
     if chinese_chars > len(text) * 0.3:
@@ -237,129 +245,173 @@ def detect_language(text: str) -> str:
     
     return "en"  # Default to English
 
+# Patterns for extract_lead_info, compiled once at module load instead of
+# per call on every message
+_EMAIL_RE = re.compile(r"[\w.\-+%]+@[\w.-]+\.[a-zA-Z]{2,}", re.IGNORECASE)
+_PHONE_RE = re.compile(r"\b(?:\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}\b")
+_PHONE_STRIP_RE = re.compile(r'[()\s-]')
+_NAME_RES = [
+    re.compile(r"(?:my name is|I am|I'm|call me|this is)\s+([A-Za-z\s]{2,30})", re.IGNORECASE),
+    re.compile(r"(?:I'm|I am)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)", re.IGNORECASE),
+    re.compile(r"(?:name|called)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)", re.IGNORECASE)
+]
+_COMPANY_RES = [
+    re.compile(r"(?:work at|work for|employed by|company is|from)\s+([A-Za-z0-9\s&.,'-]{2,50})", re.IGNORECASE),
+    re.compile(r"(?:at|@)\s+([A-Z][A-Za-z0-9\s&.,'-]{1,49})\s*(?:company|corp|inc|ltd|llc)?", re.IGNORECASE)
+]
+_INTEREST_RES = [
+    re.compile(r"(?:interested in|looking for|need|want|seeking)\s+([^.,;!?]{5,100})", re.IGNORECASE),
+    re.compile(r"(?:help with|assistance with|support for)\s+([^.,;!?]{5,100})", re.IGNORECASE)
+]
+
 def extract_lead_info(user_input: str, language: str, lead_data: Dict) -> Dict:
     """Extract lead information using language-specific patterns."""
     if not user_input:
         return lead_data
     
-    # Email extraction (universal format)
+    captured = _scan_lead_fields(user_input, lead_data)
+    
+    # One toast per message instead of one per captured field - a single
+    # frontend event regardless of how many fields matched
+    if captured:
+        st.toast(" | ".join(captured))
+    
+    return lead_data
+
+# Fields the extraction scan can fill; once all are set there is nothing
+# left to extract and the scan is skipped outright
+_LEAD_FIELDS = ("email", "phone", "name", "company", "interest")
+
+def _scan_lead_fields(user_input: str, lead_data: Dict) -> List[str]:
+    """Run the precompiled per-field searches over the input.
+
+    Each pattern scans the whole message independently, so a rejected or
+    greedy match for one field can never consume the text of another
+    (a fused alternation here ate the head of a trailing email address).
+    Returns the capture notices for the caller to toast.
+    """
+    if all(lead_data.get(field) for field in _LEAD_FIELDS):
+        return []
+
+    captured = []
     if not lead_data.get("email"):
-        email_pattern = r"[\w.\-+%]+@[\w.-]+\.[a-zA-Z]{2,}"
-        email_match = re.search(email_pattern, user_input, re.IGNORECASE)
+        email_match = _EMAIL_RE.search(user_input)
         if email_match:
             lead_data["email"] = email_match.group().lower()
-            st.toast(f"📧 Email captured: {lead_data['email']}")
-    
-    # Name extraction
+            captured.append(f"📧 Email captured: {lead_data['email']}")
+    if not lead_data.get("phone"):
+        phone_match = _PHONE_RE.search(user_input)
+        if phone_match and len(_PHONE_STRIP_RE.sub('', phone_match.group())) >= 10:
+            lead_data["phone"] = phone_match.group()
+            captured.append(f"📞 Phone captured: {lead_data['phone']}")
     if not lead_data.get("name"):
-        name_patterns = [
-            r"(?:my name is|I am|I'm|call me|this is)\s+([A-Za-z\s]{2,30})",
-            r"(?:I'm|I am)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)",
-            r"(?:name|called)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)"
-        ]
-        
-        for pattern in name_patterns:
-            name_match = re.search(pattern, user_input, re.IGNORECASE)
+        for pattern in _NAME_RES:
+            name_match = pattern.search(user_input)
             if name_match:
                 name = name_match.group(1).strip().title()
                 if len(name) > 1 and not any(word in name.lower() for word in ['email', 'phone', 'number', 'address']):
                     lead_data["name"] = name
-                    st.toast(f"👤 Name captured: {lead_data['name']}")
+                    captured.append(f"👤 Name captured: {lead_data['name']}")
                     break
-    
-    # Phone extraction
-    if not lead_data.get("phone"):
-        phone_pattern = r"\b(?:\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}\b"
-        phone_match = re.search(phone_pattern, user_input)
-        if phone_match:
-            phone = re.sub(r'[()\s-]', '', phone_match.group())
-            if len(phone) >= 10:
-                lead_data["phone"] = phone_match.group()
-                st.toast(f"📞 Phone captured: {lead_data['phone']}")
-    
-    # Company extraction
     if not lead_data.get("company"):
-        company_patterns = [
-            r"(?:work at|work for|employed by|company is|from)\s+([A-Za-z0-9\s&.,'-]{2,50})",
-            r"(?:at|@)\s+([A-Z][A-Za-z0-9\s&.,'-]{1,49})\s*(?:company|corp|inc|ltd|llc)?"
-        ]
-        
-        for pattern in company_patterns:
-            company_match = re.search(pattern, user_input, re.IGNORECASE)
+        for pattern in _COMPANY_RES:
+            company_match = pattern.search(user_input)
             if company_match:
                 company = company_match.group(1).strip().title()
                 if len(company) > 2 and not any(word in company.lower() for word in ['email', 'phone', 'number']):
                     lead_data["company"] = company
-                    st.toast(f"🏢 Company captured: {lead_data['company']}")
+                    captured.append(f"🏢 Company captured: {lead_data['company']}")
                     break
-    
-    # Interest extraction
     if not lead_data.get("interest"):
-        interest_patterns = [
-            r"(?:interested in|looking for|need|want|seeking)\s+([^.,;!?]{5,100})",
-            r"(?:help with|assistance with|support for)\s+([^.,;!?]{5,100})"
-        ]
-        
-        for pattern in interest_patterns:
-            interest_match = re.search(pattern, user_input, re.IGNORECASE)
+        for pattern in _INTEREST_RES:
+            interest_match = pattern.search(user_input)
             if interest_match:
                 interest = interest_match.group(1).strip()
                 if 5 <= len(interest) <= 100:
                     lead_data["interest"] = interest
-                    st.toast(f"💡 Interest captured: {lead_data['interest']}")
+                    captured.append(f"💡 Interest captured: {lead_data['interest']}")
                     break
-    
-    return lead_data
+    return captured
+
+def process_user_message(user_input: str, language: str, lead_data: Dict, config: Dict) -> tuple:
+    """Single-pass pipeline over a chat message.
+
+    Runs language detection, lead extraction and scoring in one call so
+    the chat handler does not pay three function round-trips per message.
+    Returns (lead_data, language, score).
+    """
+    if not user_input:
+        return lead_data, language, calculate_lead_score(lead_data, config)
+
+    # Language detection (single char pass + word check)
+    chinese_chars = sum(1 for cp in map(ord, user_input) if 0x4e00 <= cp <= 0x9fa5)
+    lowered = user_input.lower()
+    if chinese_chars > len(user_input) * 0.3:
+        language = "zh"
+    else:
+        spanish_words = ['el', 'la', 'es', 'en', 'de', 'que', 'y', 'con', 'por', 'para', 'hola', 'soy', 'estoy']
+        if any(c in "ñáéíóúü" for c in lowered) or any(word in lowered.split() for word in spanish_words):
+            language = "es"
+        else:
+            language = "en"
+
+    # Per-field extraction scan (skipped once every field is captured)
+    captured = _scan_lead_fields(user_input, lead_data)
+    if captured:
+        st.toast(" | ".join(captured))
+
+    return lead_data, language, calculate_lead_score(lead_data, config)
+
+@functools.lru_cache(maxsize=64)
+def _score_from_flags(flags: tuple, weights: tuple) -> int:
+    """Score a boolean presence vector against the scoring weights."""
+    score = sum(weight for present, weight in zip(flags, weights) if present)
+    return min(score, 100)
 
 def calculate_lead_score(lead_data: Dict, config: Dict) -> int:
     """Calculate lead score based on available information."""
-    score = 0
     scoring_config = config.get("lead_qualification", {}).get("scoring", {})
-    
-    if lead_data.get("email"):
-        score += scoring_config.get("email_provided", 30)
-    
-    if lead_data.get("phone"):
-        score += scoring_config.get("phone_provided", 20)
-    
-    if lead_data.get("company"):
-        score += scoring_config.get("company_provided", 15)
-    
-    if lead_data.get("budget"):
-        score += scoring_config.get("budget_provided", 15)
-    
-    if lead_data.get("interest"):
-        score += scoring_config.get("timeline_provided", 10)
-    
-    if lead_data.get("name"):
-        score += 10
-    
-    return min(score, 100)
+
+    # Memoize on the presence vector - the sidebar recomputes this on every
+    # rerun even though lead_data rarely changes between keystrokes
+    flags = tuple(bool(lead_data.get(k)) for k in ("email", "phone", "company", "budget", "interest", "name"))
+    weights = (
+        scoring_config.get("email_provided", 30),
+        scoring_config.get("phone_provided", 20),
+        scoring_config.get("company_provided", 15),
+        scoring_config.get("budget_provided", 15),
+        scoring_config.get("timeline_provided", 10),
+        10
+    )
+    return _score_from_flags(flags, weights)
+
+# Precomputed (priority, label, icon) tuples per language so the sidebar's
+# per-rerun call is a dict lookup plus one comparison
+_PRIORITY_TABLE = {
+    lang: (
+        ("low", texts["low_priority"], "📝"),
+        ("medium", texts["medium_priority"], "⚡"),
+        ("high", texts["high_priority"], "🔥")
+    )
+    for lang, texts in _TRANSLATIONS.items()
+}
 
 def get_lead_priority(score: int, language: str = "en") -> tuple:
     """Get lead priority based on score."""
-    if score >= 70:
-        return ("high", get_ui_text("high_priority", language), "🔥")
-    elif score >= 40:
-        return ("medium", get_ui_text("medium_priority", language), "⚡")
-    else:
-        return ("low", get_ui_text("low_priority", language), "📝")
+    table = _PRIORITY_TABLE.get(language, _PRIORITY_TABLE["en"])
+    return table[2] if score >= 70 else table[1] if score >= 40 else table[0]
 
-def build_system_prompt(config: Dict, language: str) -> str:
-    """Build system prompt based on configuration."""
-    assistant_name = config["branding"]["name"]
-    tone = config["tone"]
-    industry = config["industry_template"]
-    
-    # Get industry settings
-    industry_settings = {
-        "saas": {"business_type": "a SaaS company", "target_audience": "Business professionals"},
-        "b2b": {"business_type": "a B2B service provider", "target_audience": "Business owners"},
-        "marketing": {"business_type": "a marketing agency", "target_audience": "Businesses looking to grow"},
-        "general": {"business_type": "a business", "target_audience": "Potential customers"}
-    }.get(industry, {"business_type": "a business", "target_audience": "Potential customers"})
-    
-    prompt = f"""You are {assistant_name}, an AI lead generation assistant for LeadPulse.
+# Industry presets used when filling the prompt template
+_INDUSTRY_SETTINGS = {
+    "saas": {"business_type": "a SaaS company", "target_audience": "Business professionals"},
+    "b2b": {"business_type": "a B2B service provider", "target_audience": "Business owners"},
+    "marketing": {"business_type": "a marketing agency", "target_audience": "Businesses looking to grow"},
+    "general": {"business_type": "a business", "target_audience": "Potential customers"}
+}
+
+# The system prompt is ~90% static text; keep it as one module-level
+# template and fill the few dynamic slots with format_map
+_PROMPT_TEMPLATE = """You are {assistant_name}, an AI lead generation assistant for LeadPulse.
 
 PERSONALITY & TONE:
 - Use a {tone} tone
@@ -367,8 +419,8 @@ PERSONALITY & TONE:
 - Keep responses concise but helpful
 
 INDUSTRY FOCUS:
-- You work for {industry_settings['business_type']}
-- Your target audience is {industry_settings['target_audience']}
+- You work for {business_type}
+- Your target audience is {target_audience}
 
 PRIMARY GOALS:
 1. Engage visitors in natural conversation
@@ -395,17 +447,43 @@ CONVERSATION FLOW:
 5. Suggest next steps or offer to connect them with a human
 
 Remember: You're not just collecting data - you're building relationships and providing value."""
-    
-    return prompt
+
+@st.cache_data(show_spinner=False)
+def _build_system_prompt_cached(config_json: bytes, language: str) -> str:
+    """Build the system prompt from a serialized config (cacheable key)."""
+    config = orjson.loads(config_json)
+    industry_settings = _INDUSTRY_SETTINGS.get(
+        config["industry_template"], _INDUSTRY_SETTINGS["general"]
+    )
+    return _PROMPT_TEMPLATE.format_map({
+        "assistant_name": config["branding"]["name"],
+        "tone": config["tone"],
+        "business_type": industry_settings["business_type"],
+        "target_audience": industry_settings["target_audience"],
+        "language": language
+    })
+
+def build_system_prompt(config: Dict, language: str) -> str:
+    """Build system prompt based on configuration."""
+    # Dicts aren't hashable, so key the cache on a stable serialization;
+    # this runs every turn, so it uses the native serializer
+    return _build_system_prompt_cached(orjson.dumps(config, option=orjson.OPT_SORT_KEYS), language)
 
 def initialize_session_state():
     """Initialize session state variables."""
     if "session_id" not in st.session_state:
-        st.session_state.session_id = str(uuid.uuid4())
+        st.session_state.session_id = secrets.token_hex(16)
     
     if "messages" not in st.session_state:
         st.session_state.messages = []
     
+    # Pre-formatted "role: content" lines kept in lockstep with messages,
+    # so summarization never re-formats the whole history
+    if "messages_joined" not in st.session_state:
+        st.session_state.messages_joined = [
+            f"{m['role']}: {m['content']}" for m in st.session_state.messages
+        ]
+    
     if "lead_data" not in st.session_state:
         st.session_state.lead_data = {}
     
@@ -424,18 +502,15 @@ def initialize_session_state():
     
     return st.session_state.session_id
 
-def render_intro_page():
-    """Render the intro page."""
-    config = load_config()
-    
-    # Apply custom styling
-    st.markdown(
-        f"""
+@st.cache_data
+def _intro_css(primary_color: str, secondary_color: str, font_family: str) -> str:
+    """Render the intro-page CSS once per branding combination."""
+    return f"""
         <style>
         .stApp {{
-            background: linear-gradient(135deg, {config["branding"]["secondary_color"]} 0%, #2d2d2d 100%);
+            background: linear-gradient(135deg, {secondary_color} 0%, #2d2d2d 100%);
             color: white;
-            font-family: {config["branding"]["font_family"]};
+            font-family: {font_family};
         }}
         .intro-container {{
             text-align: center;
@@ -449,7 +524,7 @@ def render_intro_page():
         .lia-text {{
             font-size: 4rem;
             font-weight: bold;
-            color: {config["branding"]["primary_color"]};
+            color: {primary_color};
             margin: 1rem 0;
             text-shadow: 0 0 20px rgba(59, 130, 246, 0.5);
         }}
@@ -472,7 +547,19 @@ def render_intro_page():
             margin: 2rem 0 1rem 0;
         }}
         </style>
-        """,
+        """
+
+def render_intro_page():
+    """Render the intro page."""
+    config = load_config()
+    
+    # Apply custom styling (cached by branding inputs)
+    st.markdown(
+        _intro_css(
+            config["branding"]["primary_color"],
+            config["branding"]["secondary_color"],
+            config["branding"]["font_family"]
+        ),
         unsafe_allow_html=True
     )
     
@@ -509,6 +596,22 @@ def render_intro_page():
         
     st.markdown("</div>", unsafe_allow_html=True)
 
+# Static icon map for lead fields, hoisted out of render_sidebar's loop
+_LEAD_ICON_MAP = {
+    "name": "👤",
+    "email": "📧",
+    "phone": "📞",
+    "company": "🏢",
+    "interest": "💡",
+    "budget": "💰"
+}
+
+@st.cache_data
+def _language_options(supported_languages: tuple) -> tuple:
+    """Build the code->display-name dict and key list once per config."""
+    languages = {code: display_name for code, display_name in supported_languages}
+    return languages, list(languages.keys())
+
 def render_sidebar():
     """Render the sidebar with lead information and navigation."""
     config = load_config()
@@ -526,18 +629,22 @@ def render_sidebar():
     
     for page_key, page_name in pages.items():
         if st.sidebar.button(page_name, key=f"nav_{page_key}"):
+            # The button click already triggered this rerun and main()
+            # dispatches on current_page after the sidebar, so no explicit
+            # st.rerun() is needed - it would just double the render
             st.session_state.current_page = page_key
-            st.rerun()
     
     # Language selector
     st.sidebar.subheader(f"🌍 {get_ui_text('language', language)}")
     
-    languages = {lang["code"]: lang["display_name"] for lang in config["supported_languages"]}
+    languages, language_codes = _language_options(
+        tuple((lang["code"], lang["display_name"]) for lang in config["supported_languages"])
+    )
     selected_language = st.sidebar.selectbox(
         "Select Language",
-        options=list(languages.keys()),
-        format_func=lambda x: languages[x],
-        index=list(languages.keys()).index(st.session_state.language),
+        options=language_codes,
+        format_func=languages.get,
+        index=language_codes.index(st.session_state.language),
         key="language_selector"
     )
     
@@ -560,19 +667,15 @@ def render_sidebar():
         
         st.sidebar.markdown(f"{priority_icon} **{priority_text}**")
         
-        # Display lead information
-        for key, value in st.session_state.lead_data.items():
-            if value:
-                icon_map = {
-                    "name": "👤",
-                    "email": "📧", 
-                    "phone": "📞",
-                    "company": "🏢",
-                    "interest": "💡",
-                    "budget": "💰"
-                }
-                icon = icon_map.get(key, "📝")
-                st.sidebar.markdown(f"{icon} **{key.title()}:** {value}")
+        # Display lead information as a single markdown block - each widget
+        # call is a DeltaGenerator round-trip, so emit one instead of one
+        # per captured field
+        parts = [
+            f"{_LEAD_ICON_MAP.get(key, '📝')} **{key.title()}:** {value}"
+            for key, value in st.session_state.lead_data.items() if value
+        ]
+        if parts:
+            st.sidebar.markdown("\n\n".join(parts))
     
     # Quick stats
     st.sidebar.subheader("📈 Quick Stats")
@@ -586,6 +689,88 @@ def render_sidebar():
         st.metric(get_ui_text("new_today", language), "7")
         st.metric(get_ui_text("avg_score", language), "67")
 
+# Maximum number of transcript messages rendered per rerun
+_CHAT_RENDER_LIMIT = 50
+
+# The user-facing reply stays on the full model; summarization is a tiny
+# bounded task where the mini model's lower TTFT and cost win
+_CHAT_MODEL = "gpt-4o"
+_SUMMARY_MODEL = "gpt-4o-mini"
+
+# Rolling window of history sent to the model; older turns are folded into
+# a running summary so request size stays bounded on long chats
+_HISTORY_WINDOW = 12
+
+# Refresh the running summary once this many messages have aged out of
+# the window since the last fold
+_SUMMARY_REFRESH_EVERY = 10
+
+# session_id -> running summary text, written by the background summarizer
+_CONV_SUMMARIES = {}
+
+# session_id -> number of history entries already folded into the summary,
+# so each refresh only reads the newly aged-out turns
+_CONV_SUMMARY_UPTO = {}
+
+# Sessions whose summaries stay cached; beyond this the idlest entries
+# are evicted so a long-lived process doesn't grow per visitor
+_SUMMARY_CACHE_MAX = 256
+
+def _summary_cache_put(cache: dict, session_id: str, value):
+    """Insert with move-to-end and evict the idlest sessions past the cap.
+
+    Dict order is insertion order, so re-inserting on every write keeps
+    active sessions at the back and the front entries are the ones idle
+    the longest.
+    """
+    cache.pop(session_id, None)
+    cache[session_id] = value
+    while len(cache) > _SUMMARY_CACHE_MAX:
+        cache.pop(next(iter(cache)))
+
+_BACKGROUND = ThreadPoolExecutor(max_workers=2)
+
+def _append_message(role: str, content: str):
+    """Append to the chat history and its pre-formatted twin together."""
+    st.session_state.messages.append({"role": role, "content": content})
+    st.session_state.messages_joined.append(f"{role}: {content}")
+
+def _summarize_history(client, session_id: str, joined_lines: List[str], prev_summary: str):
+    """Fold new aged-out turns into the running summary (background thread).
+
+    The summarizer only ever reads the previous summary plus the turns
+    that aged out since the last refresh, so its input stays O(window)
+    instead of re-reading the whole prefix as the chat grows.
+    """
+    try:
+        text = "\n".join(joined_lines)
+        if prev_summary:
+            text = f"Summary of the conversation so far: {prev_summary}\n\nNew messages:\n{text}"
+        response = client.chat.completions.create(
+            model=_SUMMARY_MODEL,
+            messages=[
+                {"role": "system", "content": "Summarize this conversation in under 150 words. Keep any lead details (name, email, phone, company, interest, budget)."},
+                {"role": "user", "content": text}
+            ],
+            max_tokens=200,
+            temperature=0
+        )
+        _summary_cache_put(_CONV_SUMMARIES, session_id, response.choices[0].message.content)
+    except Exception:
+        # Best-effort: a missing summary only costs tokens, not correctness
+        pass
+
+def _build_openai_messages(system_prompt: str, history: List[Dict], session_id: str) -> List[Dict]:
+    """Build the outbound payload from a rolling window plus summary."""
+    messages = [{"role": "system", "content": system_prompt}]
+    if len(history) > _HISTORY_WINDOW:
+        summary = _CONV_SUMMARIES.get(session_id)
+        if summary:
+            messages.append({"role": "system", "content": f"Summary of the earlier conversation: {summary}"})
+    messages.extend(history[-_HISTORY_WINDOW:])
+    return messages
+
+@st.fragment
 def render_chat_interface():
     """Render the main chat interface."""
     config = load_config()
@@ -594,53 +779,108 @@ def render_chat_interface():
     
     st.title(f"💬 Chat with {config['branding']['name']}")
     
-    # Display chat messages
-    for message in st.session_state.messages:
-        with st.chat_message(message["role"]):
-            st.markdown(message["content"])
+    # Display chat messages. Rendering is bounded to the most recent window
+    # so per-rerun DOM work stays constant on long conversations instead of
+    # growing with the full history.
+    transcript = st.container()
+    with transcript:
+        for message in st.session_state.messages[-_CHAT_RENDER_LIMIT:]:
+            with st.chat_message(message["role"]):
+                st.markdown(message["content"])
     
     # Chat input
     if prompt := st.chat_input(get_ui_text("input_placeholder", language)):
         # Add user message to chat history
-        st.session_state.messages.append({"role": "user", "content": prompt})
+        _append_message("user", prompt)
         with st.chat_message("user"):
             st.markdown(prompt)
         
-        # Detect language and extract lead info
-        detected_lang = detect_language(prompt)
+        # Detect language, extract lead info and rescore in one pass
+        rerun_app = False
+        prev_lead = dict(st.session_state.lead_data)
+        st.session_state.lead_data, detected_lang, lead_score = process_user_message(
+            prompt, language, st.session_state.lead_data, config
+        )
         if detected_lang != language:
             st.session_state.language = detected_lang
             language = detected_lang
+            rerun_app = True
         
-        # Extract lead information
-        st.session_state.lead_data = extract_lead_info(prompt, language, st.session_state.lead_data)
+        # Persist newly captured fields off the chat path; unchanged turns
+        # skip the write entirely
+        if st.session_state.lead_data != prev_lead:
+            st.session_state.lead_data["score"] = lead_score
+            get_session_manager().save_lead_data_async(
+                st.session_state.session_id, st.session_state.lead_data
+            )
+            rerun_app = True
         
         # Generate AI response
         with st.chat_message("assistant"):
             try:
                 system_prompt = build_system_prompt(config, language)
                 
-                messages = [{"role": "system", "content": system_prompt}]
-                messages.extend(st.session_state.messages)
+                messages = _build_openai_messages(
+                    system_prompt, st.session_state.messages, st.session_state.session_id
+                )
+                
+                # Kick off the periodic summary refresh before the reply
+                # request so the two round-trips overlap instead of running
+                # back to back; the summary is read on the next turn. The
+                # cadence counts messages aged out of the window since the
+                # last fold, so it fires regardless of history parity.
+                if len(st.session_state.messages) > _HISTORY_WINDOW:
+                    session_id = st.session_state.session_id
+                    folded = _CONV_SUMMARY_UPTO.get(session_id, 0)
+                    cutoff = len(st.session_state.messages) - _HISTORY_WINDOW
+                    if cutoff - folded >= _SUMMARY_REFRESH_EVERY or (folded == 0 and cutoff > 0):
+                        _summary_cache_put(_CONV_SUMMARY_UPTO, session_id, cutoff)
+                        _BACKGROUND.submit(
+                            _summarize_history, client, session_id,
+                            st.session_state.messages_joined[folded:cutoff],
+                            _CONV_SUMMARIES.get(session_id)
+                        )
                 
-                response = client.chat.completions.create(
-                    model="gpt-4o",
+                stream = client.chat.completions.create(
+                    model=_CHAT_MODEL,
                     messages=messages,
                     max_tokens=500,
-                    temperature=0.7
+                    temperature=0.7,
+                    stream=True
                 )
                 
-                assistant_response = response.choices[0].message.content
-                st.markdown(assistant_response)
+                # Render tokens as they arrive; write_stream returns the
+                # concatenated text for persistence in the history
+                assistant_response = st.write_stream(
+                    chunk.choices[0].delta.content or "" for chunk in stream
+                )
                 
                 # Add assistant response to chat history
-                st.session_state.messages.append({"role": "assistant", "content": assistant_response})
+                _append_message("assistant", assistant_response)
+                
+                # Persist the turn's user+assistant pair in one batched
+                # DB write instead of two per-message round-trips
+                get_session_manager().save_messages_batch(
+                    st.session_state.session_id,
+                    [("user", prompt, language), ("assistant", assistant_response, language)]
+                )
                 
             except Exception as e:
                 error_msg = get_ui_text("error_message", language)
                 st.error(error_msg)
-                st.session_state.messages.append({"role": "assistant", "content": error_msg})
+                _append_message("assistant", error_msg)
+                get_session_manager().save_messages_batch(
+                    st.session_state.session_id,
+                    [("user", prompt, language), ("assistant", error_msg, language)]
+                )
+        
+        # The sidebar's lead panel and language selector render outside
+        # this fragment, so a fragment-scoped rerun leaves them stale;
+        # escalate to a full rerun when the state they display changed
+        if rerun_app:
+            st.rerun(scope="app")
 
+@st.fragment
 def render_dashboard_page():
     """Render the dashboard page."""
     language = st.session_state.language
@@ -688,6 +928,7 @@ def render_dashboard_page():
     
     st.dataframe(recent_leads, use_container_width=True)
 
+@st.fragment
 def render_settings_page():
     """Render the settings page."""
     language = st.session_state.language
@@ -753,11 +994,51 @@ def render_settings_page():
         else:
             st.error("❌ Failed to save settings")
 
+# Key for the legacy keyed-blake2b admin hashes still accepted below
+_ADMIN_KEY = os.getenv("ADMIN_HASH_KEY", "leadpulse").encode()
+
+def hash_admin_password(password: str) -> str:
+    """Hash the admin password for storage in config["admin"]["password_hash"]."""
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+
+def verify_admin_password(password: str, config: Dict) -> bool:
+    """Verify a password attempt against the stored hash.
+
+    bcrypt hashes are checked with checkpw (constant-time, real KDF).
+    Legacy fast digests (keyed blake2b, bare sha256) are still accepted
+    once and transparently rehashed to bcrypt on success.
+    """
+    stored_hash = config.get("admin", {}).get("password_hash")
+    if not stored_hash:
+        return False
+    
+    if stored_hash.startswith("$2"):
+        try:
+            return bcrypt.checkpw(password.encode(), stored_hash.encode())
+        except ValueError:
+            return False
+    
+    # Legacy digest migration path
+    blake2_digest = hashlib.blake2b(password.encode(), key=_ADMIN_KEY, digest_size=32).hexdigest()
+    sha256_digest = hashlib.sha256(password.encode()).hexdigest()
+    if hmac.compare_digest(blake2_digest, stored_hash) or hmac.compare_digest(sha256_digest, stored_hash):
+        config["admin"]["password_hash"] = hash_admin_password(password)
+        save_config(config)
+        return True
+    return False
+
 def check_admin_access():
     """Check if user has admin access."""
-    query_params = st.query_params
-    return "admin" in query_params and st.session_state.admin_authenticated
-    
+    return "admin" in st.query_params and st.session_state.admin_authenticated
+    
+# Page dispatch table. Each renderer is an st.fragment, so input events
+# inside a page rerun only that page's subtree rather than the whole script.
+_PAGES = {
+    "chat": render_chat_interface,
+    "dashboard": render_dashboard_page,
+    "settings": render_settings_page
+}
+
 def main():
     """Main application function."""
     # Initialize session state
@@ -775,14 +1056,7 @@ def main():
     render_sidebar()
     
     # Render main content based on current page
-    current_page = st.session_state.current_page
-    
-    if current_page == "chat":
-        render_chat_interface()
-    elif current_page == "dashboard":
-        render_dashboard_page()
-    elif current_page == "settings":
-        render_settings_page()
+    _PAGES.get(st.session_state.current_page, render_chat_interface)()
     
     # Add footer
     st.markdown("---")
@@ -1,9 +1,11 @@
 from openai import OpenAI
+import atexit
 import re
 import os
 
-# 🔐 Your actual API key here
-openai.api_key = os.getenv("OPENAI_API_KEY")
+# 🔐 One client for the process; built once so every request reuses its
+# connection pool instead of re-handshaking
+client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 # 🧠 Conversation memory
 messages = [
@@ -13,6 +15,10 @@ messages = [
     }
 ]
 
+# 🪟 Turns sent per request: the system prompt plus the most recent
+# exchanges, so request size stops growing with conversation length
+MAX_HISTORY = 24
+
 # 📝 Lead data
 lead_data = {
     "name": None,
@@ -20,31 +26,43 @@ lead_data = {
     "interest": None
 }
 
+# 🧠 One combined pattern: a single pass over the message matches all
+# three fields, dispatched on the named group that fired
+LEAD_RE = re.compile(
+    r'(?P<email>\b[\w\.-]+@[\w\.-]+\.\w+\b)'
+    r"|my name is\s+(?P<name>[A-Za-z][\w'-]{0,40})"
+    r'|interested in\s+(?P<interest>[^.\n]+)',
+    re.IGNORECASE
+)
+
 # 🧠 Extract info from user input
 def extract_lead_info(user_input):
-    # Email extraction
-    if not lead_data['email']:
-        email_match = re.search(r'\b[\w\.-]+@[\w\.-]+\.\w+\b', user_input)
-        if email_match:
-            lead_data['email'] = email_match.group()
-            print("[✅] Email captured:", lead_data['email'])
-
-    # Name extraction
-    if not lead_data['name']:
-        if "my name is" in user_input.lower():
-            lead_data['name'] = user_input.split("is")[-1].strip().split()[0]
-            print("[✅] Name captured:", lead_data['name'])
-
-    # Interest extraction
-    if not lead_data['interest']:
-        if "interested in" in user_input.lower():
-            lead_data['interest'] = user_input.split("interested in")[-1].strip()
-            print("[✅] Interest captured:", lead_data['interest'])
-
-# 📝 Save lead to file
+    if all(lead_data.values()):
+        return  # every field captured; skip the scan entirely
+    for match in LEAD_RE.finditer(user_input):
+        field = match.lastgroup
+        if not lead_data[field]:
+            value = match.group(field).strip()
+            if field == 'name':
+                value = value.capitalize()
+            lead_data[field] = value
+            print(f"[✅] {field.capitalize()} captured:", lead_data[field])
+
+# 📝 Save lead to file — the handle stays open across saves so each save
+# is a single buffered write instead of an open/write/close cycle
+_lead_file = None
+
+def _lead_handle():
+    global _lead_file
+    if _lead_file is None:
+        _lead_file = open("leads.txt", "a", buffering=1 << 16)
+        atexit.register(_lead_file.close)
+    return _lead_file
+
 def save_lead():
-    with open("leads.txt", "a") as file:
-        file.write(f"{lead_data['name']} | {lead_data['email']} | {lead_data['interest']}\n")
+    file = _lead_handle()
+    file.write(f"{lead_data['name']} | {lead_data['email']} | {lead_data['interest']}\n")
+    file.flush()  # a captured lead should survive a crash
     print("🔐 Lead saved!")
     print("[📂] Saved to:", os.path.abspath("leads.txt"))
 
@@ -53,12 +71,23 @@ def chatbot_response(user_input):
     messages.append({"role": "user", "content": user_input})
     extract_lead_info(user_input)
 
-    response = client.chat.completions.create(
+    stream = client.chat.completions.create(
         model="gpt-3.5-turbo",
-        messages=messages
+        messages=[messages[0]] + messages[1:][-MAX_HISTORY:],
+        stream=True
     )
 
-    reply = response.choices[0].message.content
+    # Print tokens as they arrive so the wait is time-to-first-token,
+    # not time-to-last-token
+    print("Bot: ", end="", flush=True)
+    parts = []
+    for chunk in stream:
+        delta = chunk.choices[0].delta.content or ""
+        parts.append(delta)
+        print(delta, end="", flush=True)
+    print()
+
+    reply = "".join(parts)
     messages.append({"role": "assistant", "content": reply})
 
     if all(lead_data.values()):
@@ -73,7 +102,6 @@ while True:
     if user_input.lower() in ["exit", "quit"]:
         print("Bot: Goodbye, co-founder!")
         break
-    reply = chatbot_response(user_input)
-    print("Bot:", reply)
+    chatbot_response(user_input)
 
 
@@ -1,5 +1,9 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+import concurrent.futures
+import functools
 import streamlit as st
 from typing import Dict, List, Optional, Any
 from datetime import datetime
@@ -117,49 +121,90 @@ class CRMIntegrationManager:
             return False
     
     def sync_lead_to_integrations(self, lead_data: Dict, session_id: str) -> Dict[str, bool]:
-        """Sync lead data to all configured integrations."""
-        results = {}
+        """Sync lead data to all configured integrations concurrently.
+
+        Each provider call is an independent HTTP round-trip, so they run
+        on the shared pool and the total latency is the slowest provider
+        rather than the sum of all of them.
+        """
+        enabled = self.enabled_set()
+        futures = {
+            integration_id: _FANOUT.submit(integration.sync_lead, lead_data)
+            for integration_id, integration in self.integrations.items()
+            if integration_id in enabled
+        }
+        if not futures:
+            return {}
         
-        for integration_id, integration in self.integrations.items():
-            if self._is_integration_enabled(integration_id):
-                try:
-                    success = integration.sync_lead(lead_data)
-                    results[integration_id] = success
-                    
-                    # Log sync result
-                    self.db.log_analytics_event(
-                        event_type="lead_synced",
-                        session_id=session_id,
-                        data={
-                            "integration": integration_id,
-                            "success": success,
-                            "lead_name": lead_data.get('name', 'Unknown')
-                        }
-                    )
-                except Exception as e:
-                    logging.error(f"Failed to sync lead to {integration_id}: {e}")
-                    results[integration_id] = False
+        concurrent.futures.wait(futures.values(), timeout=15)
+        
+        results = {}
+        for integration_id, future in futures.items():
+            try:
+                results[integration_id] = future.result(timeout=0) if future.done() else False
+            except Exception as e:
+                logging.error(f"Failed to sync lead to {integration_id}: {e}")
+                results[integration_id] = False
+            
+            # Log sync result once the outcome is known
+            self.db.log_analytics_event(
+                event_type="lead_synced",
+                session_id=session_id,
+                data={
+                    "integration": integration_id,
+                    "success": results[integration_id],
+                    "lead_name": lead_data.get('name', 'Unknown')
+                }
+            )
         
         return results
     
     def send_lead_notification(self, lead_data: Dict, session_id: str) -> Dict[str, bool]:
-        """Send lead notifications to messaging integrations."""
-        results = {}
+        """Send lead notifications to messaging integrations concurrently."""
+        enabled = self.enabled_set()
         
         messaging_integrations = ['slack', 'discord', 'webhook']
         
-        for integration_id in messaging_integrations:
-            if self._is_integration_enabled(integration_id):
-                try:
-                    integration = self.integrations[integration_id]
-                    success = integration.send_notification(lead_data)
-                    results[integration_id] = success
-                except Exception as e:
-                    logging.error(f"Failed to send notification to {integration_id}: {e}")
-                    results[integration_id] = False
+        futures = {
+            integration_id: _FANOUT.submit(
+                self.integrations[integration_id].send_notification, lead_data
+            )
+            for integration_id in messaging_integrations
+            if integration_id in enabled
+        }
+        if not futures:
+            return {}
+        
+        concurrent.futures.wait(futures.values(), timeout=15)
+        
+        results = {}
+        for integration_id, future in futures.items():
+            try:
+                results[integration_id] = future.result(timeout=0) if future.done() else False
+            except Exception as e:
+                logging.error(f"Failed to send notification to {integration_id}: {e}")
+                results[integration_id] = False
         
         return results
     
+    @staticmethod
+    @functools.lru_cache(maxsize=32)
+    def _enabled_from(config_items: tuple) -> frozenset:
+        """Build the enabled-id set from a hashable config snapshot."""
+        return frozenset(integration_id for integration_id, enabled in config_items if enabled)
+    
+    def enabled_set(self) -> frozenset:
+        """Set of enabled integration ids for the current session config.
+
+        Fan-out paths consult this once per message instead of walking
+        the session config per integration.
+        """
+        config = st.session_state.get('integrations_config', {})
+        return self._enabled_from(tuple(sorted(
+            (integration_id, bool(c.get('enabled', False)))
+            for integration_id, c in config.items()
+        )))
+    
     def _get_integration_status(self, integration_id: str) -> str:
         """Get integration status (configured, enabled, disabled)."""
         if 'integrations_config' in st.session_state:
@@ -174,12 +219,39 @@ class CRMIntegrationManager:
         """Check if integration is enabled."""
         return self._get_integration_status(integration_id) == 'enabled'
 
+# Shared pool for concurrent lead fan-out (CRM sync + notifications + email)
+_FANOUT = concurrent.futures.ThreadPoolExecutor(max_workers=8)
+
+def _build_http_session() -> requests.Session:
+    """HTTP session shared by every integration.
+
+    Keeps connections to each API host alive across calls, so repeat
+    syncs skip the TCP + TLS handshake, and retries transient failures
+    with backoff instead of dropping the lead on a flaky 5xx/429.
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=frozenset(['GET', 'POST'])
+    )
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+# One pooled session for the process; requests.Session is thread-safe for
+# the fan-out paths above
+_HTTP_SESSION = _build_http_session()
+
 class BaseIntegration:
     """Base class for all integrations."""
     
     def __init__(self):
         self.config = {}
         self.is_configured = False
+        self.session = _HTTP_SESSION
     
     def configure(self, config: Dict) -> bool:
         """Configure the integration."""
@@ -222,7 +294,7 @@ class HubSpotIntegration(BaseIntegration):
                 'Content-Type': 'application/json'
             }
             
-            response = requests.get(
+            response = self.session.get(
                 f"https://api.hubapi.com/contacts/v1/lists/all/contacts/all",
                 headers=headers,
                 params={'count': 1}
@@ -258,7 +330,7 @@ class HubSpotIntegration(BaseIntegration):
                 ]
             }
             
-            response = requests.post(
+            response = self.session.post(
                 'https://api.hubapi.com/contacts/v1/contact',
                 headers=headers,
                 json=contact_data
@@ -304,7 +376,7 @@ class SalesforceIntegration(BaseIntegration):
                 'Description': f"Interest: {lead_data.get('interest', 'N/A')}, Budget: {lead_data.get('budget', 'N/A')}"
             }
             
-            response = requests.post(
+            response = self.session.post(
                 f"{self.config['instance_url']}/services/data/v52.0/sobjects/Lead/",
                 headers=headers,
                 json=sf_lead_data
@@ -358,7 +430,7 @@ class AirtableIntegration(BaseIntegration):
                 ]
             }
             
-            response = requests.post(
+            response = self.session.post(
                 f"https://api.airtable.com/v0/{self.config['base_id']}/{self.config['table_name']}",
                 headers=headers,
                 json=record_data
@@ -429,7 +501,7 @@ class NotionIntegration(BaseIntegration):
                 }
             }
             
-            response = requests.post(
+            response = self.session.post(
                 'https://api.notion.com/v1/pages',
                 headers=headers,
                 json=page_data
@@ -478,7 +550,7 @@ class SlackIntegration(BaseIntegration):
                 ]
             }
             
-            response = requests.post(
+            response = self.session.post(
                 self.config['webhook_url'],
                 json=message
             )
@@ -524,7 +596,7 @@ class DiscordIntegration(BaseIntegration):
             
             message = {'embeds': [embed]}
             
-            response = requests.post(
+            response = self.session.post(
                 self.config['webhook_url'],
                 json=message
             )
@@ -570,7 +642,7 @@ class WebhookIntegration(BaseIntegration):
             if 'headers' in self.config:
                 headers.update(self.config['headers'])
             
-            response = requests.post(
+            response = self.session.post(
                 self.config['webhook_url'],
                 json=payload,
                 headers=headers,
@@ -582,13 +654,8 @@ class WebhookIntegration(BaseIntegration):
             logging.error(f"Failed to send webhook notification: {e}")
             return False
 
-# Singleton instance
-_crm_manager = None
-
+@st.cache_resource
 def get_crm_manager() -> CRMIntegrationManager:
     """Get the CRM integration manager singleton instance."""
-    global _crm_manager
-    if _crm_manager is None:
-        _crm_manager = CRMIntegrationManager()
-    return _crm_manager
+    return CRMIntegrationManager()
 
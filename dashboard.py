@@ -9,35 +9,111 @@ st.set_page_config(page_title="LeadPulse Dashboard", page_icon="📈")
 st.title("📊 Lead Dashboard")
 st.markdown("Track all the leads captured by LeadPulse in one place.")
 
-# 📃 Define path to the leads file
+# 📃 Define paths: leads.txt is the append log, leads.parquet the typed mirror
 leads_file = "leads.txt"
+parquet_file = "leads.parquet"
 
-# 🔍 Check if file exists
-if os.path.exists(leads_file):
-    with open(leads_file, "r") as f:
-        lines = f.readlines()
+# ⏸️ Rows shipped to the browser per page; keeps the Arrow serialization
+# and websocket payload bounded as the lead log grows
+page_size = 200
 
-    # 📂 Parse the data
-    leads = [line.strip().split(" | ") for line in lines if line.strip()]
-   df = pd.DataFrame(leads, columns=["Name", "Email", "Interest", "Phone"])
 
+@st.cache_data(show_spinner=False)
+def _load_leads(mtime):
+    """Load leads as a typed DataFrame via a Parquet mirror of leads.txt.
 
-    # 🌀 Display the DataFrame
-    st.dataframe(df, use_container_width=True)
+    Cached per leads.txt mtime, so reruns from widget interaction reuse
+    the in-memory frame and only a new write reloads anything. On a
+    cache miss the append log is re-parsed only when it has new rows;
+    otherwise the loader reads the columnar mirror directly.
+    """
+    if os.path.exists(parquet_file) and os.path.getmtime(parquet_file) >= mtime:
+        return _with_search_blob(pd.read_parquet(parquet_file, dtype_backend="pyarrow"))
+
+    # 📂 Parse the log with the vectorized C reader and refresh the mirror
+    df = pd.read_csv(
+        leads_file,
+        sep="|",
+        engine="c",
+        header=None,
+        names=["Name", "Email", "Interest", "Phone"],
+        dtype="string[pyarrow]",
+        skip_blank_lines=True,
+    )
+    df = df.apply(lambda col: col.str.strip())
+    df.to_parquet(parquet_file, index=False)
+    return _with_search_blob(df)
+
+
+def _with_search_blob(df):
+    """Attach a lowercased concatenation of all columns for searching.
+
+    Built once per cached load; the search filter then needs a single
+    vectorized substring scan instead of per-row Python formatting.
+    """
+    blob = df.iloc[:, 0].fillna("")
+    for col in df.columns[1:]:
+        blob = blob + "\x1f" + df[col].fillna("")
+    df["_search_blob"] = blob.str.lower()
+    return df
+
+
+def load_leads():
+    """Load the leads frame, or None when no leads were captured yet."""
+    if not os.path.exists(leads_file):
+        return None
+    return _load_leads(os.path.getmtime(leads_file))
+
+
+@st.cache_data(show_spinner=False)
+def _filtered_leads(mtime, search):
+    """Search results cached per (file, term) pair.
+
+    Reruns with the same search text reuse the memoized slice instead of
+    re-walking every row.
+    """
+    df = _load_leads(mtime)
+    return df[df["_search_blob"].str.contains(search.lower(), regex=False, na=False)]
+
+
+@st.cache_data(show_spinner=False)
+def _leads_csv_bytes(mtime):
+    """Serialized CSV export, cached on the same mtime key as the frame."""
+    df = _load_leads(mtime)
+    return df.drop(columns="_search_blob").to_csv(index=False).encode('utf-8')
+
+
+df = load_leads()
+
+# 🔍 Check if any leads exist
+if df is not None:
+    # 🌀 Display the DataFrame (minus the internal search column), one
+    # bounded page at a time
+    display_cols = [col for col in df.columns if col != "_search_blob"]
+    total_pages = max(1, -(-len(df) // page_size))
+    if total_pages > 1:
+        page = st.number_input("Page", min_value=1, max_value=total_pages, value=1)
+        st.caption(f"Showing page {page} of {total_pages} ({len(df)} leads)")
+    else:
+        page = 1
+    view = df.iloc[(page - 1) * page_size : page * page_size]
+    st.dataframe(view[display_cols], use_container_width=True)
 
     # 🔀 Add filters (optional)
     search = st.text_input("Search by name or interest")
     if search:
-        df_filtered = df[df.apply(lambda row: search.lower() in row.astype(str).str.lower().to_string(), axis=1)]
-        st.dataframe(df_filtered, use_container_width=True)
-else:
-    st.warning("No leads found yet. Start chatting in LeadPulse to collect leads!")
-        # 📥 Add a download button
-    csv = df.to_csv(index=False).encode('utf-8')
+        df_filtered = _filtered_leads(os.path.getmtime(leads_file), search)
+        if len(df_filtered) > page_size:
+            st.caption(f"Showing first {page_size} of {len(df_filtered)} matches")
+        st.dataframe(df_filtered[display_cols].head(page_size), use_container_width=True)
+
+    # 📥 Add a download button
+    csv = _leads_csv_bytes(os.path.getmtime(leads_file))
     st.download_button(
         label="📥 Download Leads as CSV",
         data=csv,
         file_name='leadpulse_leads.csv',
         mime='text/csv',
     )
-
+else:
+    st.warning("No leads found yet. Start chatting in LeadPulse to collect leads!")
@@ -1,6 +1,6 @@
 import sqlite3
-import json
-import uuid
+import orjson
+from uuid6 import uuid7
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 import streamlit as st
@@ -88,7 +88,7 @@ class DatabaseManager:
     
     def create_session(self, user_identifier: str = None, language: str = "en") -> str:
         """Create a new session."""
-        session_id = str(uuid.uuid4())
+        session_id = str(uuid7())
         
         if not user_identifier:
             user_identifier = f"anonymous_{session_id[:8]}"
@@ -99,7 +99,7 @@ class DatabaseManager:
         cursor.execute('''
             INSERT INTO sessions (id, user_identifier, language, metadata)
             VALUES (?, ?, ?, ?)
-        ''', (session_id, user_identifier, language, json.dumps({})))
+        ''', (session_id, user_identifier, language, orjson.dumps({}).decode()))
         
         conn.commit()
         conn.close()
@@ -127,7 +127,7 @@ class DatabaseManager:
                 'created_at': row[3],
                 'last_active': row[4],
                 'is_active': bool(row[5]),
-                'metadata': json.loads(row[6]) if row[6] else {}
+                'metadata': orjson.loads(row[6]) if row[6] else {}
             }
         return None
     
@@ -144,11 +144,8 @@ class DatabaseManager:
         conn.commit()
         conn.close()
     
-    def save_lead(self, lead_data: Dict, session_id: str) -> str:
-        """Save or update lead information."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
+    def _save_lead_with_cursor(self, cursor, lead_data: Dict, session_id: str) -> str:
+        """Run the lead upsert on an existing cursor (no commit)."""
         # Check if lead already exists for this session
         cursor.execute('''
             SELECT id FROM leads WHERE session_id = ?
@@ -186,7 +183,7 @@ class DatabaseManager:
             ))
         else:
             # Create new lead
-            lead_id = str(uuid.uuid4())
+            lead_id = str(uuid7())
             cursor.execute('''
                 INSERT INTO leads (
                     id, session_id, name, email, phone, company, interest, 
@@ -207,6 +204,35 @@ class DatabaseManager:
                 lead_data.get('status', 'new')
             ))
         
+        return lead_id
+    
+    def save_lead(self, lead_data: Dict, session_id: str) -> str:
+        """Save or update lead information."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        lead_id = self._save_lead_with_cursor(cursor, lead_data, session_id)
+        
+        conn.commit()
+        conn.close()
+        
+        return lead_id
+    
+    def save_lead_and_touch_session(self, lead_data: Dict, session_id: str) -> str:
+        """Save lead data and refresh session activity in one transaction.
+
+        Collapses the two per-turn writes into a single commit so one
+        fsync covers both mutations.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        lead_id = self._save_lead_with_cursor(cursor, lead_data, session_id)
+        cursor.execute('''
+            UPDATE sessions SET last_active = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', (session_id,))
+        
         conn.commit()
         conn.close()
         
@@ -248,7 +274,7 @@ class DatabaseManager:
     def save_conversation_message(self, session_id: str, role: str, content: str, 
                                  lead_id: str = None, language: str = "en") -> str:
         """Save a conversation message."""
-        message_id = str(uuid.uuid4())
+        message_id = str(uuid7())
         
         conn = self.get_connection()
         cursor = conn.cursor()
@@ -263,6 +289,32 @@ class DatabaseManager:
         
         return message_id
     
+    def save_conversation_messages(self, session_id: str, messages: List[Tuple],
+                                   lead_id: str = None) -> List[str]:
+        """Save several conversation messages in one transaction.
+
+        messages is a list of (role, content, language) tuples. Using a
+        single executemany halves round-trips and amortizes the commit
+        when a turn stores both the user and assistant message.
+        """
+        message_ids = [str(uuid7()) for _ in messages]
+        
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.executemany('''
+            INSERT INTO conversations (id, session_id, lead_id, role, content, language)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', [
+            (message_id, session_id, lead_id, role, content, language)
+            for message_id, (role, content, language) in zip(message_ids, messages)
+        ])
+        
+        conn.commit()
+        conn.close()
+        
+        return message_ids
+    
     def get_conversation_history(self, session_id: str, limit: int = 50) -> List[Dict]:
         """Get conversation history for a session."""
         conn = self.get_connection()
@@ -375,7 +427,7 @@ class DatabaseManager:
     def log_analytics_event(self, event_type: str, session_id: str = None, 
                            lead_id: str = None, data: Dict = None):
         """Log analytics event."""
-        event_id = str(uuid.uuid4())
+        event_id = str(uuid7())
         
         conn = self.get_connection()
         cursor = conn.cursor()
@@ -383,7 +435,7 @@ class DatabaseManager:
         cursor.execute('''
             INSERT INTO analytics (id, event_type, session_id, lead_id, data)
             VALUES (?, ?, ?, ?, ?)
-        ''', (event_id, event_type, session_id, lead_id, json.dumps(data) if data else None))
+        ''', (event_id, event_type, session_id, lead_id, orjson.dumps(data).decode() if data else None))
         
         conn.commit()
         conn.close()
@@ -393,37 +445,30 @@ class DatabaseManager:
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        # Total leads
+        # One grouped scan of the window; the (priority, language) cells
+        # roll up to every aggregate the summary needs
         cursor.execute('''
-            SELECT COUNT(*) FROM leads 
+            SELECT priority, language, COUNT(*), COUNT(score), COALESCE(SUM(score), 0)
+            FROM leads 
             WHERE created_at >= datetime('now', '-{} days')
+            GROUP BY priority, language
         '''.format(days))
-        total_leads = cursor.fetchone()[0]
-        
-        # Leads by priority
-        cursor.execute('''
-            SELECT priority, COUNT(*) FROM leads 
-            WHERE created_at >= datetime('now', '-{} days')
-            GROUP BY priority
-        '''.format(days))
-        leads_by_priority = dict(cursor.fetchall())
+        rows = cursor.fetchall()
+        conn.close()
         
-        # Leads by language
-        cursor.execute('''
-            SELECT language, COUNT(*) FROM leads 
-            WHERE created_at >= datetime('now', '-{} days')
-            GROUP BY language
-        '''.format(days))
-        leads_by_language = dict(cursor.fetchall())
+        total_leads = 0
+        scored = 0
+        score_sum = 0
+        leads_by_priority = {}
+        leads_by_language = {}
+        for priority, language, count, score_count, scores in rows:
+            total_leads += count
+            scored += score_count
+            score_sum += scores
+            leads_by_priority[priority] = leads_by_priority.get(priority, 0) + count
+            leads_by_language[language] = leads_by_language.get(language, 0) + count
         
-        # Average score
-        cursor.execute('''
-            SELECT AVG(score) FROM leads 
-            WHERE created_at >= datetime('now', '-{} days')
-        '''.format(days))
-        avg_score = cursor.fetchone()[0] or 0
-        
-        conn.close()
+        avg_score = score_sum / scored if scored else 0
         
         return {
             'total_leads': total_leads,
@@ -446,12 +491,11 @@ class DatabaseManager:
         conn.commit()
         conn.close()
 
-# Singleton instance
-_db_manager = None
-
+@st.cache_resource
 def get_db_manager() -> DatabaseManager:
-    """Get the database manager singleton instance."""
-    global _db_manager
-    if _db_manager is None:
-        _db_manager = DatabaseManager()
-    return _db_manager
\ No newline at end of file
+    """Get the database manager singleton instance.
+
+    st.cache_resource pins one instance per process, so table
+    initialization runs once rather than per rerun/session.
+    """
+    return DatabaseManager()
\ No newline at end of file
@@ -1,17 +1,159 @@
 import smtplib
 import ssl
-from email.mime.text import MimeText
-from email.mime.multipart import MimeMultipart
-from email.mime.base import MimeBase
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+from email.mime.base import MIMEBase
 from email import encoders
+from string import Template
 import streamlit as st
 from typing import Dict, List, Optional
 import json
+import queue
+import threading
 from datetime import datetime
 import logging
 from database import get_db_manager
 from multilanguage import get_ui_text
 
+# Pre-parsed notification bodies, one Template per language. Templates
+# are parsed once at import; each send substitutes into the selected
+# language only, where the old f-string dict formatted all three
+# variants on every call.
+_NEW_LEAD_BODY_TMPL = {
+    "en": Template("""
+    <html>
+    <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+        <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+            <h2 style="color: #3B82F6;">🚀 New Lead Captured!</h2>
+            
+            <div style="background-color: #f8f9fa; padding: 20px; border-radius: 8px; margin: 20px 0;">
+                <h3 style="margin-top: 0;">Lead Information:</h3>
+                <p><strong>Name:</strong> $name</p>
+                <p><strong>Email:</strong> $email</p>
+                <p><strong>Phone:</strong> $phone</p>
+                <p><strong>Company:</strong> $company</p>
+                <p><strong>Interest:</strong> $interest</p>
+                <p><strong>Budget:</strong> $budget</p>
+                <p><strong>Priority:</strong> <span style="color: $priority_color;">$priority_label</span></p>
+                <p><strong>Score:</strong> $score/100</p>
+            </div>
+            
+            <p>This lead was captured on $captured_at via Lia AI Assistant.</p>
+            
+            <div style="margin-top: 30px; padding: 15px; background-color: #e3f2fd; border-radius: 5px;">
+                <p style="margin: 0;"><strong>Next Steps:</strong></p>
+                <ul style="margin: 10px 0;">
+                    <li>Review the lead information</li>
+                    <li>Reach out within 24 hours for best results</li>
+                    <li>Update lead status in the dashboard</li>
+                </ul>
+            </div>
+            
+            <hr style="margin: 30px 0; border: none; border-top: 1px solid #eee;">
+            <p style="font-size: 12px; color: #666;">
+                This email was sent automatically by Lia AI Assistant.<br>
+                Powered by LeadPulse - AI Lead Generation Platform
+            </p>
+        </div>
+    </body>
+    </html>
+    """),
+    "zh": Template("""
+    <html>
+    <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+        <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+            <h2 style="color: #3B82F6;">🚀 捕获新的潜在客户！</h2>
+            
+            <div style="background-color: #f8f9fa; padding: 20px; border-radius: 8px; margin: 20px 0;">
+                <h3 style="margin-top: 0;">潜在客户信息：</h3>
+                <p><strong>姓名：</strong> $name</p>
+                <p><strong>邮箱：</strong> $email</p>
+                <p><strong>电话：</strong> $phone</p>
+                <p><strong>公司：</strong> $company</p>
+                <p><strong>兴趣：</strong> $interest</p>
+                <p><strong>预算：</strong> $budget</p>
+                <p><strong>优先级：</strong> <span style="color: $priority_color;">$priority_label</span></p>
+                <p><strong>评分：</strong> $score/100</p>
+            </div>
+            
+            <p>此潜在客户于 $captured_at 通过 Lia AI 助手捕获。</p>
+            
+            <div style="margin-top: 30px; padding: 15px; background-color: #e3f2fd; border-radius: 5px;">
+                <p style="margin: 0;"><strong>下一步：</strong></p>
+                <ul style="margin: 10px 0;">
+                    <li>查看潜在客户信息</li>
+                    <li>在24小时内联系以获得最佳效果</li>
+                    <li>在仪表板中更新潜在客户状态</li>
+                </ul>
+            </div>
+            
+            <hr style="margin: 30px 0; border: none; border-top: 1px solid #eee;">
+            <p style="font-size: 12px; color: #666;">
+                此邮件由 Lia AI 助手自动发送。<br>
+                由 LeadPulse - AI 潜在客户生成平台提供支持
+            </p>
+        </div>
+    </body>
+    </html>
+    """),
+    "es": Template("""
+    <html>
+    <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+        <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+            <h2 style="color: #3B82F6;">🚀 ¡Nuevo Lead Capturado!</h2>
+            
+            <div style="background-color: #f8f9fa; padding: 20px; border-radius: 8px; margin: 20px 0;">
+                <h3 style="margin-top: 0;">Información del Lead:</h3>
+                <p><strong>Nombre:</strong> $name</p>
+                <p><strong>Email:</strong> $email</p>
+                <p><strong>Teléfono:</strong> $phone</p>
+                <p><strong>Empresa:</strong> $company</p>
+                <p><strong>Interés:</strong> $interest</p>
+                <p><strong>Presupuesto:</strong> $budget</p>
+                <p><strong>Prioridad:</strong> <span style="color: $priority_color;">$priority_label</span></p>
+                <p><strong>Puntuación:</strong> $score/100</p>
+            </div>
+            
+            <p>Este lead fue capturado el $captured_at a través del Asistente AI Lia.</p>
+            
+            <div style="margin-top: 30px; padding: 15px; background-color: #e3f2fd; border-radius: 5px;">
+                <p style="margin: 0;"><strong>Próximos Pasos:</strong></p>
+                <ul style="margin: 10px 0;">
+                    <li>Revisar la información del lead</li>
+                    <li>Contactar dentro de 24 horas para mejores resultados</li>
+                    <li>Actualizar el estado del lead en el dashboard</li>
+                </ul>
+            </div>
+            
+            <hr style="margin: 30px 0; border: none; border-top: 1px solid #eee;">
+            <p style="font-size: 12px; color: #666;">
+                Este email fue enviado automáticamente por el Asistente AI Lia.<br>
+                Powered by LeadPulse - Plataforma de Generación de Leads AI
+            </p>
+        </div>
+    </body>
+    </html>
+    """)
+}
+        
+
+_NEW_LEAD_MISSING = {"en": "Not provided", "zh": "未提供", "es": "No proporcionado"}
+
+_PRIORITY_COLORS = {"high": "#ff4444", "medium": "#ffaa00", "low": "#44ff44"}
+
+_PRIORITY_LABELS = {
+    "en": {"high": "High", "medium": "Medium", "low": "Low"},
+    "zh": {"high": "高", "medium": "中", "low": "低"},
+    "es": {"high": "Alta", "medium": "Media", "low": "Baja"},
+}
+
+_CAPTURED_AT_FMT = {
+    "en": "%Y-%m-%d at %H:%M",
+    "zh": "%Y-%m-%d %H:%M",
+    "es": "%Y-%m-%d a las %H:%M",
+}
+
+
 class EmailNotificationManager:
     """Manages email notifications for lead generation events."""
     
@@ -19,6 +161,14 @@ class EmailNotificationManager:
         self.db = get_db_manager()
         self.smtp_config = self._load_smtp_config()
         
+        # Deliveries run on a single daemon worker that keeps one SMTP
+        # connection open, so a lead capture only pays for enqueueing a
+        # message instead of a TLS handshake and login
+        self._queue = queue.Queue()
+        self._server = None
+        self._server_config = None
+        threading.Thread(target=self._smtp_worker, daemon=True).start()
+        
     def _load_smtp_config(self) -> Dict:
         """Load SMTP configuration from Streamlit secrets or config."""
         try:
@@ -176,16 +326,16 @@ class EmailNotificationManager:
                 return False
             
             # Create message
-            message = MimeMultipart("alternative")
+            message = MIMEMultipart("alternative")
             message["Subject"] = subject
             message["From"] = f"{self.smtp_config['from_name']} <{self.smtp_config['from_email']}>"
             message["To"] = ", ".join(recipients)
             
             # Add body
             if is_html:
-                part = MimeText(body, "html")
+                part = MIMEText(body, "html")
             else:
-                part = MimeText(body, "plain")
+                part = MIMEText(body, "plain")
             message.attach(part)
             
             # Add attachments if any
@@ -193,7 +343,7 @@ class EmailNotificationManager:
                 for file_path in attachments:
                     try:
                         with open(file_path, "rb") as attachment:
-                            part = MimeBase('application', 'octet-stream')
+                            part = MIMEBase('application', 'octet-stream')
                             part.set_payload(attachment.read())
                         
                         encoders.encode_base64(part)
@@ -205,29 +355,69 @@ class EmailNotificationManager:
                     except Exception as e:
                         logging.error(f"Failed to attach file {file_path}: {e}")
             
-            # Send email
-            context = ssl.create_default_context()
-            with smtplib.SMTP(self.smtp_config['smtp_server'], self.smtp_config['smtp_port']) as server:
-                server.starttls(context=context)
-                server.login(self.smtp_config['username'], self.smtp_config['password'])
-                server.sendmail(self.smtp_config['from_email'], recipients, message.as_string())
-            
-            # Log successful send
-            self.db.log_analytics_event(
-                event_type="email_sent",
-                data={
-                    "recipients": recipients,
-                    "subject": subject,
-                    "type": "notification"
-                }
-            )
-            
+            # Hand off to the SMTP worker; the caller returns immediately
+            self._queue.put((list(recipients), subject, message))
             return True
             
         except Exception as e:
             logging.error(f"Failed to send email: {e}")
             return False
     
+    def _smtp_worker(self):
+        """Drain queued messages over one persistent SMTP connection."""
+        while True:
+            recipients, subject, message = self._queue.get()
+            try:
+                self._deliver(recipients, subject, message)
+            except Exception as e:
+                logging.error(f"Failed to send email: {e}")
+            finally:
+                self._queue.task_done()
+    
+    def _deliver(self, recipients: List[str], subject: str, message):
+        """Send one message, reconnecting once if the server dropped us."""
+        try:
+            self._ensure_connection()
+            self._server.sendmail(self.smtp_config['from_email'], recipients, message.as_string())
+        except smtplib.SMTPServerDisconnected:
+            self._server = None
+            self._ensure_connection()
+            self._server.sendmail(self.smtp_config['from_email'], recipients, message.as_string())
+        
+        # Log successful send
+        self.db.log_analytics_event(
+            event_type="email_sent",
+            data={
+                "recipients": recipients,
+                "subject": subject,
+                "type": "notification"
+            }
+        )
+    
+    def _ensure_connection(self):
+        """(Re)open the pooled SMTP connection if missing, stale, or reconfigured."""
+        if self._server is not None and self._server_config == self.smtp_config:
+            # Probe idle connections; servers drop sessions after a few
+            # minutes and a failed NOOP is cheaper than a failed send
+            try:
+                self._server.noop()
+                return
+            except Exception:
+                self._server = None
+        
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except Exception:
+                pass
+        
+        context = ssl.create_default_context()
+        server = smtplib.SMTP(self.smtp_config['smtp_server'], self.smtp_config['smtp_port'])
+        server.starttls(context=context)
+        server.login(self.smtp_config['username'], self.smtp_config['password'])
+        self._server = server
+        self._server_config = dict(self.smtp_config)
+    
     def _get_email_subject(self, email_type: str, language: str, lead_data: Dict = None) -> str:
         """Generate email subject based on type and language."""
         subjects = {
@@ -262,124 +452,22 @@ class EmailNotificationManager:
     
     def _generate_new_lead_email_body(self, lead_data: Dict, language: str) -> str:
         """Generate HTML email body for new lead notification."""
-        templates = {
-            "en": f"""
-            <html>
-            <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                    <h2 style="color: #3B82F6;">🚀 New Lead Captured!</h2>
-                    
-                    <div style="background-color: #f8f9fa; padding: 20px; border-radius: 8px; margin: 20px 0;">
-                        <h3 style="margin-top: 0;">Lead Information:</h3>
-                        <p><strong>Name:</strong> {lead_data.get('name', 'Not provided')}</p>
-                        <p><strong>Email:</strong> {lead_data.get('email', 'Not provided')}</p>
-                        <p><strong>Phone:</strong> {lead_data.get('phone', 'Not provided')}</p>
-                        <p><strong>Company:</strong> {lead_data.get('company', 'Not provided')}</p>
-                        <p><strong>Interest:</strong> {lead_data.get('interest', 'Not provided')}</p>
-                        <p><strong>Budget:</strong> {lead_data.get('budget', 'Not provided')}</p>
-                        <p><strong>Priority:</strong> <span style="color: {'#ff4444' if lead_data.get('priority') == 'high' else '#ffaa00' if lead_data.get('priority') == 'medium' else '#44ff44'};">{lead_data.get('priority', 'low').title()}</span></p>
-                        <p><strong>Score:</strong> {lead_data.get('score', 0)}/100</p>
-                    </div>
-                    
-                    <p>This lead was captured on {datetime.now().strftime('%Y-%m-%d at %H:%M')} via Lia AI Assistant.</p>
-                    
-                    <div style="margin-top: 30px; padding: 15px; background-color: #e3f2fd; border-radius: 5px;">
-                        <p style="margin: 0;"><strong>Next Steps:</strong></p>
-                        <ul style="margin: 10px 0;">
-                            <li>Review the lead information</li>
-                            <li>Reach out within 24 hours for best results</li>
-                            <li>Update lead status in the dashboard</li>
-                        </ul>
-                    </div>
-                    
-                    <hr style="margin: 30px 0; border: none; border-top: 1px solid #eee;">
-                    <p style="font-size: 12px; color: #666;">
-                        This email was sent automatically by Lia AI Assistant.<br>
-                        Powered by LeadPulse - AI Lead Generation Platform
-                    </p>
-                </div>
-            </body>
-            </html>
-            """,
-            "zh": f"""
-            <html>
-            <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                    <h2 style="color: #3B82F6;">🚀 捕获新的潜在客户！</h2>
-                    
-                    <div style="background-color: #f8f9fa; padding: 20px; border-radius: 8px; margin: 20px 0;">
-                        <h3 style="margin-top: 0;">潜在客户信息：</h3>
-                        <p><strong>姓名：</strong> {lead_data.get('name', '未提供')}</p>
-                        <p><strong>邮箱：</strong> {lead_data.get('email', '未提供')}</p>
-                        <p><strong>电话：</strong> {lead_data.get('phone', '未提供')}</p>
-                        <p><strong>公司：</strong> {lead_data.get('company', '未提供')}</p>
-                        <p><strong>兴趣：</strong> {lead_data.get('interest', '未提供')}</p>
-                        <p><strong>预算：</strong> {lead_data.get('budget', '未提供')}</p>
-                        <p><strong>优先级：</strong> <span style="color: {'#ff4444' if lead_data.get('priority') == 'high' else '#ffaa00' if lead_data.get('priority') == 'medium' else '#44ff44'};">{'高' if lead_data.get('priority') == 'high' else '中' if lead_data.get('priority') == 'medium' else '低'}</span></p>
-                        <p><strong>评分：</strong> {lead_data.get('score', 0)}/100</p>
-                    </div>
-                    
-                    <p>此潜在客户于 {datetime.now().strftime('%Y-%m-%d %H:%M')} 通过 Lia AI 助手捕获。</p>
-                    
-                    <div style="margin-top: 30px; padding: 15px; background-color: #e3f2fd; border-radius: 5px;">
-                        <p style="margin: 0;"><strong>下一步：</strong></p>
-                        <ul style="margin: 10px 0;">
-                            <li>查看潜在客户信息</li>
-                            <li>在24小时内联系以获得最佳效果</li>
-                            <li>在仪表板中更新潜在客户状态</li>
-                        </ul>
-                    </div>
-                    
-                    <hr style="margin: 30px 0; border: none; border-top: 1px solid #eee;">
-                    <p style="font-size: 12px; color: #666;">
-                        此邮件由 Lia AI 助手自动发送。<br>
-                        由 LeadPulse - AI 潜在客户生成平台提供支持
-                    </p>
-                </div>
-            </body>
-            </html>
-            """,
-            "es": f"""
-            <html>
-            <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                    <h2 style="color: #3B82F6;">🚀 ¡Nuevo Lead Capturado!</h2>
-                    
-                    <div style="background-color: #f8f9fa; padding: 20px; border-radius: 8px; margin: 20px 0;">
-                        <h3 style="margin-top: 0;">Información del Lead:</h3>
-                        <p><strong>Nombre:</strong> {lead_data.get('name', 'No proporcionado')}</p>
-                        <p><strong>Email:</strong> {lead_data.get('email', 'No proporcionado')}</p>
-                        <p><strong>Teléfono:</strong> {lead_data.get('phone', 'No proporcionado')}</p>
-                        <p><strong>Empresa:</strong> {lead_data.get('company', 'No proporcionado')}</p>
-                        <p><strong>Interés:</strong> {lead_data.get('interest', 'No proporcionado')}</p>
-                        <p><strong>Presupuesto:</strong> {lead_data.get('budget', 'No proporcionado')}</p>
-                        <p><strong>Prioridad:</strong> <span style="color: {'#ff4444' if lead_data.get('priority') == 'high' else '#ffaa00' if lead_data.get('priority') == 'medium' else '#44ff44'};">{'Alta' if lead_data.get('priority') == 'high' else 'Media' if lead_data.get('priority') == 'medium' else 'Baja'}</span></p>
-                        <p><strong>Puntuación:</strong> {lead_data.get('score', 0)}/100</p>
-                    </div>
-                    
-                    <p>Este lead fue capturado el {datetime.now().strftime('%Y-%m-%d a las %H:%M')} a través del Asistente AI Lia.</p>
-                    
-                    <div style="margin-top: 30px; padding: 15px; background-color: #e3f2fd; border-radius: 5px;">
-                        <p style="margin: 0;"><strong>Próximos Pasos:</strong></p>
-                        <ul style="margin: 10px 0;">
-                            <li>Revisar la información del lead</li>
-                            <li>Contactar dentro de 24 horas para mejores resultados</li>
-                            <li>Actualizar el estado del lead en el dashboard</li>
-                        </ul>
-                    </div>
-                    
-                    <hr style="margin: 30px 0; border: none; border-top: 1px solid #eee;">
-                    <p style="font-size: 12px; color: #666;">
-                        Este email fue enviado automáticamente por el Asistente AI Lia.<br>
-                        Powered by LeadPulse - Plataforma de Generación de Leads AI
-                    </p>
-                </div>
-            </body>
-            </html>
-            """
-        }
+        lang = language if language in _NEW_LEAD_BODY_TMPL else "en"
+        missing = _NEW_LEAD_MISSING[lang]
+        priority = lead_data.get('priority', 'low')
         
-        return templates.get(language, templates["en"])
+        return _NEW_LEAD_BODY_TMPL[lang].substitute(
+            name=lead_data.get('name') or missing,
+            email=lead_data.get('email') or missing,
+            phone=lead_data.get('phone') or missing,
+            company=lead_data.get('company') or missing,
+            interest=lead_data.get('interest') or missing,
+            budget=lead_data.get('budget') or missing,
+            priority_color=_PRIORITY_COLORS.get(priority, _PRIORITY_COLORS['low']),
+            priority_label=_PRIORITY_LABELS[lang].get(priority, _PRIORITY_LABELS[lang]['low']),
+            score=lead_data.get('score', 0),
+            captured_at=datetime.now().strftime(_CAPTURED_AT_FMT[lang]),
+        )
     
     def _generate_status_update_email_body(self, lead_data: Dict, old_status: str, 
                                           new_status: str, language: str) -> str:
@@ -447,13 +535,8 @@ class EmailNotificationManager:
         </html>
         """
 
-# Singleton instance
-_email_manager = None
-
+@st.cache_resource
 def get_email_manager() -> EmailNotificationManager:
     """Get the email manager singleton instance."""
-    global _email_manager
-    if _email_manager is None:
-        _email_manager = EmailNotificationManager()
-    return _email_manager
+    return EmailNotificationManager()
 
@@ -1,7 +1,9 @@
 import streamlit as st
 from typing import Dict, List
+import functools
 import re
 import os
+import httpx
 from openai import OpenAI
 
 # Translation dictionaries for UI elements
@@ -76,28 +78,66 @@ LEAD_EXTRACTION_PATTERNS = {
     # ... unchanged ...
 }
 
+@functools.lru_cache(maxsize=None)
+def _compiled(pattern: str):
+    """Compile an extraction pattern once; patterns come from the table above."""
+    return re.compile(pattern, re.IGNORECASE)
+
+_PHONE_STRIP_RE = re.compile(r'[()\s-]')
+
 @st.cache_resource
 def get_openai_client():
     api_key = st.secrets.get("OPENAI_API_KEY") or os.getenv("OPENAI_API_KEY")
     if not api_key:
         st.error("OpenAI API key not found. Provide it in Streamlit secrets or environment variables.")
         st.stop()
-    return OpenAI(api_key=api_key)
+    return OpenAI(
+        api_key=api_key,
+        http_client=httpx.Client(
+            http2=True,
+            timeout=httpx.Timeout(60.0, connect=5.0),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
+        )
+    )
 
 client = get_openai_client()
 
-def get_ui_text(key: str, language: str = "en") -> str:
-    """Get UI text in the target language."""
-    return TRANSLATIONS.get(language, TRANSLATIONS["en"]).get(key, TRANSLATIONS["en"].get(key, key))
+@functools.lru_cache(maxsize=4096)
+def get_ui_text(key: str, language: str = "en", fallback: str = None) -> str:
+    """Get UI text in the target language.
+
+    Keys missing from every table fall back to the caller-supplied
+    default (pages pass their literal English label) or, failing that,
+    the key itself.
+    """
+    table = TRANSLATIONS.get(language, TRANSLATIONS["en"])
+    if key in table:
+        return table[key]
+    return TRANSLATIONS["en"].get(key, fallback if fallback is not None else key)
+
+def get_ui_texts(keys: List[str], language: str = "en", defaults: Dict[str, str] = None) -> Dict[str, str]:
+    """Fetch several UI strings with a single language-table lookup.
+
+    Widget-heavy pages call get_ui_text dozens of times per render; a
+    prefetched dict turns those into local subscripts.
+    """
+    table = TRANSLATIONS.get(language, TRANSLATIONS["en"])
+    fallback = TRANSLATIONS["en"]
+    defaults = defaults or {}
+    return {key: table.get(key, fallback.get(key, defaults.get(key, key))) for key in keys}
+
+# A three-way language label is well within the mini model's reach and
+# its time-to-first-token is what the fallback path actually waits on
+_DETECT_MODEL = "gpt-4o-mini"
 
 def detect_language(text: str) -> str:
     """Detect language from user input using heuristics, fallback to OpenAI."""
     if not text:
         return "en"
-    chinese_chars = len(re.findall(r'[\u4e00-\u9fa5]', text))
+    chinese_chars = sum(1 for cp in map(ord, text) if 0x4e00 <= cp <= 0x9fa5)
     if chinese_chars > len(text) * 0.3:
         return "zh"
-    spanish_chars = len(re.findall(r'[ñáéíóúü]', text.lower()))
+    spanish_chars = sum(1 for c in text.lower() if c in "ñáéíóúü")
     spanish_words = ['el', 'la', 'es', 'en', 'de', 'que', 'y', 'con', 'por', 'para', 'hola', 'soy', 'estoy']
     words = re.findall(r'\w+', text.lower())
     if spanish_chars > 0 or any(w in words for w in spanish_words):
@@ -105,7 +145,7 @@ def detect_language(text: str) -> str:
     # Fallback to OpenAI language detection
     try:
         response = client.chat.completions.create(
-            model="gpt-4o",
+            model=_DETECT_MODEL,
             messages=[
                 {"role": "system", "content": "Detect the language of the text. Respond only with 'en', 'zh', or 'es'."},
                 {"role": "user", "content": f"Language of: {text[:200]}"}
@@ -120,15 +160,20 @@ def detect_language(text: str) -> str:
         st.warning(f"Language detection failed: {e}")
     return "en"
 
+# Fields the multilingual extractor can fill
+_EXTRACT_FIELDS = ("email", "name", "phone", "company", "interest", "budget")
+
 def extract_lead_info_multilingual(user_input: str, language: str, lead_data: Dict) -> Dict:
     """Extract lead info from user input based on language-specific patterns."""
     if not user_input:
         return lead_data
+    if all(lead_data.get(field) for field in _EXTRACT_FIELDS):
+        return lead_data
     updated = False
     # EMAIL extraction (same pattern for all)
     if not lead_data.get("email"):
         pattern = LEAD_EXTRACTION_PATTERNS["email"].get(language, LEAD_EXTRACTION_PATTERNS["email"]["en"])
-        match = re.search(pattern, user_input, re.IGNORECASE)
+        match = _compiled(pattern).search(user_input)
         if match:
             lead_data["email"] = match.group().lower()
             st.success(f"📧 {get_ui_text('email_prompt', language)}: {lead_data['email']}")
@@ -138,7 +183,7 @@ def extract_lead_info_multilingual(user_input: str, language: str, lead_data: Di
     if not lead_data.get("name"):
         patterns = LEAD_EXTRACTION_PATTERNS["name"].get(language, LEAD_EXTRACTION_PATTERNS["name"]["en"])
         for pattern in patterns:
-            match = re.search(pattern, user_input, re.IGNORECASE)
+            match = _compiled(pattern).search(user_input)
             if match:
                 name = match.group(1).strip().title()
                 if len(name) > 1 and not any(word in name.lower() for word in ['email', 'phone', 'number', 'address']):
@@ -150,9 +195,9 @@ def extract_lead_info_multilingual(user_input: str, language: str, lead_data: Di
     # PHONE extraction
     if not lead_data.get("phone"):
         pattern = LEAD_EXTRACTION_PATTERNS["phone"].get(language, LEAD_EXTRACTION_PATTERNS["phone"]["en"])
-        match = re.search(pattern, user_input)
+        match = _compiled(pattern).search(user_input)
         if match:
-            phone = re.sub(r'[()\s-]', '', match.group())
+            phone = _PHONE_STRIP_RE.sub('', match.group())
             if len(phone) >= 10:  # basic validation
                 lead_data["phone"] = phone
                 st.success(f"📞 {get_ui_text('phone_prompt', language)}: {lead_data['phone']}")
@@ -162,7 +207,7 @@ def extract_lead_info_multilingual(user_input: str, language: str, lead_data: Di
     if not lead_data.get("company"):
         patterns = LEAD_EXTRACTION_PATTERNS["company"].get(language, LEAD_EXTRACTION_PATTERNS["company"]["en"])
         for pattern in patterns:
-            match = re.search(pattern, user_input, re.IGNORECASE)
+            match = _compiled(pattern).search(user_input)
             if match:
                 company = match.group(1).strip().title()
                 if len(company) > 2 and not any(word in company.lower() for word in ['email', 'phone', 'number']):
@@ -175,7 +220,7 @@ def extract_lead_info_multilingual(user_input: str, language: str, lead_data: Di
     if not lead_data.get("interest"):
         patterns = LEAD_EXTRACTION_PATTERNS["interest"].get(language, LEAD_EXTRACTION_PATTERNS["interest"]["en"])
         for pattern in patterns:
-            match = re.search(pattern, user_input, re.IGNORECASE)
+            match = _compiled(pattern).search(user_input)
             if match:
                 interest = match.group(1).strip()
                 if 5 <= len(interest) <= 100:
@@ -188,7 +233,7 @@ def extract_lead_info_multilingual(user_input: str, language: str, lead_data: Di
     if not lead_data.get("budget"):
         patterns = LEAD_EXTRACTION_PATTERNS["budget"].get(language, LEAD_EXTRACTION_PATTERNS["budget"]["en"])
         for pattern in patterns:
-            match = re.search(pattern, user_input, re.IGNORECASE)
+            match = _compiled(pattern).search(user_input)
             if match:
                 budget = match.group(1)
                 currency = "$" if language == "en" else "¥" if language == "zh" else "€" if language == "es" else "$"
@@ -200,21 +245,20 @@ def extract_lead_info_multilingual(user_input: str, language: str, lead_data: Di
     return lead_data
 
 
+# Field weights for scoring; a data table instead of an if-chain
+_SCORE_WEIGHTS = (
+    ("email", 30),
+    ("phone", 20),
+    ("company", 15),
+    ("budget", 15),
+    ("interest", 10),
+    ("name", 10),
+)
+
+
 def calculate_lead_score(lead_data: Dict) -> int:
     """Calculate lead score based on presence of fields."""
-    score = 0
-    if lead_data.get("email"):
-        score += 30
-    if lead_data.get("phone"):
-        score += 20
-    if lead_data.get("company"):
-        score += 15
-    if lead_data.get("budget"):
-        score += 15
-    if lead_data.get("interest"):
-        score += 10
-    if lead_data.get("name"):
-        score += 10
+    score = sum(weight for field, weight in _SCORE_WEIGHTS if lead_data.get(field))
     return min(score, 100)
 
 
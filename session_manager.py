@@ -1,5 +1,6 @@
 import streamlit as st
 from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
 import hashlib
 import uuid
 from datetime import datetime, timedelta
@@ -48,8 +49,9 @@ class SessionManager:
         user_agent = self._get_user_agent()
         timestamp = str(datetime.now().timestamp())
         
-        # Create a hash of user agent + timestamp for uniqueness
-        identifier = hashlib.md5(f"{user_agent}_{timestamp}".encode()).hexdigest()[:12]
+        # Create a hash of user agent + timestamp for uniqueness; this is
+        # an identifier, not a credential, so take the non-security path
+        identifier = hashlib.md5(f"{user_agent}_{timestamp}".encode(), usedforsecurity=False).hexdigest()[:12]
         return f"user_{identifier}"
     
     def _get_user_agent(self) -> str:
@@ -73,6 +75,20 @@ class SessionManager:
             language=language
         )
     
+    def save_messages_batch(self, session_id: str, messages: List,
+                            lead_id: str = None) -> List[str]:
+        """Save a turn's messages in one batched DB write.
+
+        messages is a list of (role, content, language) tuples; both the
+        user and assistant message of a turn go through a single
+        transaction instead of two save_message round-trips.
+        """
+        return self.db.save_conversation_messages(
+            session_id=session_id,
+            messages=messages,
+            lead_id=lead_id
+        )
+    
     def load_lead_data(self, session_id: str) -> Dict:
         """Load lead data for session."""
         lead_data = self.db.get_lead_by_session(session_id)
@@ -97,6 +113,17 @@ class SessionManager:
             'language': 'en', 'score': 0, 'priority': 'low', 'status': 'new'
         }
     
+    def save_lead_data_async(self, session_id: str, lead_data: Dict):
+        """Persist lead data off the chat request path.
+
+        Submits the write (plus its analytics event) to a background
+        worker so the caller can continue straight to the UI rerun; the
+        saved state is picked up on the next rerun. Returns the future
+        for callers that do want to wait. The lead save and the session
+        activity touch share one transaction.
+        """
+        return _persist_pool.submit(self.save_lead_and_touch_session, session_id, dict(lead_data))
+    
     def save_lead_data(self, session_id: str, lead_data: Dict) -> str:
         """Save lead data for session."""
         lead_id = self.db.save_lead(lead_data, session_id)
@@ -111,6 +138,19 @@ class SessionManager:
         
         return lead_id
     
+    def save_lead_and_touch_session(self, session_id: str, lead_data: Dict) -> str:
+        """Save lead data and session activity in one DB transaction."""
+        lead_id = self.db.save_lead_and_touch_session(lead_data, session_id)
+        
+        self.db.log_analytics_event(
+            event_type="lead_updated",
+            session_id=session_id,
+            lead_id=lead_id,
+            data={"fields_updated": list(lead_data.keys())}
+        )
+        
+        return lead_id
+    
     def initialize_session_state(self):
         """Initialize Streamlit session state with persistent data."""
         session_id = self.get_or_create_session()
@@ -210,12 +250,11 @@ class SessionManager:
         
         return None
 
-# Singleton instance
-_session_manager = None
+# Background worker for fire-and-forget persistence; a single worker keeps
+# writes for a session ordered
+_persist_pool = ThreadPoolExecutor(max_workers=1)
 
+@st.cache_resource
 def get_session_manager() -> SessionManager:
     """Get the session manager singleton instance."""
-    global _session_manager
-    if _session_manager is None:
-        _session_manager = SessionManager()
-    return _session_manager
\ No newline at end of file
+    return SessionManager()
\ No newline at end of file